@@ -4,26 +4,392 @@ from mcp.server.sse import SseServerTransport
 from starlette.applications import Starlette
 from starlette.routing import Mount, Route
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
-from jira import JIRA
+from typing import List, Optional, Dict, Any, Tuple, Union
+from cachetools import TTLCache
+from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener
+import asyncio
+import functools
+import httpx
+import logging
 import os
+import queue
 import json
+import re
 import uuid
 
+log = logging.getLogger("jira_mcp")
+
+# Only the fields the tool projections below actually read; the sprint and
+# acceptance criteria ids are appended per client once they are resolved
+BASE_ISSUE_FIELDS = "summary,status,assignee,created,description,issuetype,priority"
+
+# Custom fields are looked up by name, falling back to these ids when the
+# instance doesn't expose a field with that name
+SPRINT_FIELD_NAME = "sprint"
+ACCEPTANCE_CRITERIA_FIELD_NAME = "acceptance criteria"
+DEFAULT_SPRINT_FIELD = "customfield_10020"
+DEFAULT_ACCEPTANCE_CRITERIA_FIELD = "customfield_10127"
+
+# Agents often re-read the same issue within seconds, so single-issue lookups
+# are memoised briefly; entries are keyed on (issue_key, fields)
+ISSUE_CACHE_TTL = 30
+ISSUE_CACHE_SIZE = 1024
+
+# Single-issue lookups arriving within this window (in seconds) are coalesced
+# into one bulk search of at most ISSUE_BATCH_SIZE keys
+ISSUE_BATCH_WINDOW = 0.01
+ISSUE_BATCH_SIZE = 50
+
+# Jira returns at most this many issues per search request
+MAX_SEARCH_PAGE_SIZE = 100
+# Project key, a dash and the issue number (e.g. PROJ-123); anything else
+# would break the JQL a key is spliced into
+ISSUE_KEY_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9_]*-[0-9]+")
+
+def _settle(futures: List[asyncio.Future], result: Any = None, error: Optional[Exception] = None):
+    """Resolve every caller still waiting on a batched lookup."""
+    for future in futures:
+        if future.done():
+            continue
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+class AsyncJira:
+    """
+    Minimal asyncio client for the Jira REST endpoints the tools use.
+    
+    Requests go through one httpx.AsyncClient, so many tool calls can be in
+    flight at once on the event loop, multiplexed over a pooled HTTP/2
+    connection, instead of each blocking a worker thread.
+    """
+    
+    def __init__(self, server: str, email: str, api_token: str):
+        if not server.startswith(("http://", "https://")):
+            server = f"https://{server}"
+        self._client = httpx.AsyncClient(
+            base_url=f"{server.rstrip('/')}/rest/api/2/",
+            auth=(email, api_token),
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        )
+        # Only touched from the event loop, so no lock is needed
+        self._issue_cache = TTLCache(maxsize=ISSUE_CACHE_SIZE, ttl=ISSUE_CACHE_TTL)
+        # Keys waiting for the next batched lookup, each with its callers' futures
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._batches: set = set()
+        self._fields_resolved = False
+        self._set_custom_fields(DEFAULT_SPRINT_FIELD, DEFAULT_ACCEPTANCE_CRITERIA_FIELD)
+        # Looked up from serverInfo on first use; None until then
+        self._is_cloud: Optional[bool] = None
+    
+    async def is_cloud(self) -> bool:
+        """
+        Whether the server is Jira Cloud, from serverInfo's deploymentType.
+        
+        Cloud only serves searches from /search/jql, which pages with
+        nextPageToken and reports no total; Data Center keeps /search with startAt.
+        """
+        if self._is_cloud is None:
+            response = await self._client.get("serverInfo")
+            response.raise_for_status()
+            self._is_cloud = response.json().get("deploymentType") == "Cloud"
+        return self._is_cloud
+    
+    def _set_custom_fields(self, sprint_field: str, ac_field: str):
+        self.sprint_field = sprint_field
+        self.ac_field = ac_field
+        self.issue_fields = f"{BASE_ISSUE_FIELDS},{sprint_field},{ac_field}"
+    
+    async def resolve_fields(self):
+        """
+        Resolve the sprint and acceptance criteria field ids by name.
+        
+        Field metadata is fetched once per client and kept for the process
+        lifetime, so renumbered custom fields work without code changes. If
+        the lookup fails, the default ids stay in use and a later call retries.
+        """
+        if self._fields_resolved:
+            return
+        field_ids: Dict[str, str] = {}
+        try:
+            response = await self._client.get("field")
+            response.raise_for_status()
+            for field in response.json():
+                field_ids.setdefault(field["name"].lower(), field["id"])
+        except (httpx.HTTPError, ValueError, KeyError, TypeError):
+            # e.g. no permission, a transient 5xx or a proxy error page
+            log.warning("Could not resolve custom field ids, using defaults", exc_info=True)
+            return
+        self._set_custom_fields(
+            field_ids.get(SPRINT_FIELD_NAME, DEFAULT_SPRINT_FIELD),
+            field_ids.get(ACCEPTANCE_CRITERIA_FIELD_NAME, DEFAULT_ACCEPTANCE_CRITERIA_FIELD),
+        )
+        self._fields_resolved = True
+    
+    async def issue(self, issue_key: str, fields: Optional[str] = None) -> Dict[str, Any]:
+        """Fetch a single issue as raw REST JSON, served from a short-lived cache when possible."""
+        fields = fields or self.issue_fields
+        cache_key = (issue_key, fields)
+        cached = self._issue_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        response = await self._client.get(f"issue/{issue_key}", params={"fields": fields})
+        response.raise_for_status()
+        issue = response.json()
+        self._issue_cache[cache_key] = issue
+        return issue
+    
+    async def load_issue(self, issue_key: str) -> Dict[str, Any]:
+        """
+        Fetch a single issue with the projected fields, batching concurrent lookups.
+        
+        Keys requested within ISSUE_BATCH_WINDOW of each other (e.g. from
+        separate SSE sessions) are fetched with one 'key in (...)' search and
+        each caller gets its own issue back (DataLoader pattern).
+        """
+        cached = self._issue_cache.get((issue_key, self.issue_fields))
+        if cached is not None:
+            return cached
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(issue_key, []).append(future)
+        if len(self._pending) >= ISSUE_BATCH_SIZE:
+            self._dispatch_batch()
+        elif self._flush_timer is None:
+            self._flush_timer = loop.call_later(ISSUE_BATCH_WINDOW, self._dispatch_batch)
+        return await future
+    
+    def _dispatch_batch(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.create_task(self._fetch_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+    
+    async def _fetch_batch(self, batch: Dict[str, List[asyncio.Future]]):
+        # A malformed key would fail the query for every other key in the batch,
+        # so its callers get an error straight away and it is never sent
+        for issue_key in [issue_key for issue_key in batch if not ISSUE_KEY_PATTERN.fullmatch(issue_key)]:
+            _settle(batch.pop(issue_key), error=ValueError(f"Invalid issue key: {issue_key}"))
+        if not batch:
+            return
+        try:
+            result = await self.search(
+                f'key in ({",".join(batch)})', max_results=len(batch), validate_query=False
+            )
+            found = {issue["key"]: issue for issue in result["issues"]}
+        except Exception:
+            # e.g. Jira rejected the query; fall back to direct lookups
+            log.debug("Bulk issue lookup failed, falling back to direct lookups", exc_info=True)
+            found = {}
+        for issue_key, issue in found.items():
+            if issue_key in batch:
+                self._issue_cache[(issue_key, self.issue_fields)] = issue
+                _settle(batch[issue_key], issue)
+        # Unknown, moved or differently-cased keys don't come back under the
+        # requested key; look those up directly for a precise answer or error
+        missing = [issue_key for issue_key in batch if issue_key not in found]
+        issues = await asyncio.gather(*(self.issue(issue_key) for issue_key in missing), return_exceptions=True)
+        for issue_key, issue in zip(missing, issues):
+            if isinstance(issue, Exception):
+                _settle(batch[issue_key], error=issue)
+            else:
+                _settle(batch[issue_key], issue)
+    
+    async def search(
+        self, jql: str, start_at: int = 0, max_results: int = 100, fields: Optional[str] = None,
+        validate_query: bool = True, next_page_token: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Run one page of a JQL search and return the raw REST JSON.
+        
+        On Cloud the page after this one is requested with its nextPageToken and
+        validate_query is ignored (/search/jql doesn't take it); on Data Center
+        pages are addressed with start_at.
+        """
+        fields = fields or self.issue_fields
+        if await self.is_cloud():
+            params = {"jql": jql, "maxResults": max_results, "fields": fields}
+            if next_page_token:
+                params["nextPageToken"] = next_page_token
+            response = await self._client.get("search/jql", params=params)
+        else:
+            response = await self._client.get("search", params={
+                "jql": jql,
+                "startAt": start_at,
+                "maxResults": max_results,
+                "fields": fields,
+                "validateQuery": "strict" if validate_query else "warn",
+            })
+        response.raise_for_status()
+        return response.json()
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Jira connection settings from the MCP server config."""
+    server: str
+    email: str
+    api_token: str
+    
+    @classmethod
+    def from_env(cls) -> "Settings":
+        return cls(
+            server=os.getenv('JIRA_SERVER', ''),
+            email=os.getenv('JIRA_EMAIL', ''),
+            api_token=os.getenv('JIRA_API_TOKEN', ''),
+        )
+    
+    def validate(self):
+        if not self.server:
+            raise ValueError("JIRA_SERVER environment variable is required")
+        if not self.email:
+            raise ValueError("JIRA_EMAIL environment variable is required")
+        if not self.api_token:
+            raise ValueError("JIRA_API_TOKEN environment variable is required")
+
+# Credentials don't change while the process is running, so they are read
+# once at import rather than from os.environ on every tool call
+SETTINGS = Settings.from_env()
+
+@functools.lru_cache(maxsize=128)
+def _client_for(settings: Settings) -> AsyncJira:
+    """
+    Build a long-lived Jira client for one set of credentials.
+
+    The client is cached so its connection pool (and the keep-alive HTTPS
+    connections in it) is reused across tool calls instead of paying a fresh
+    TCP/TLS handshake on every request. Settings are validated here, so only
+    the first call pays for it.
+    """
+    settings.validate()
+    return AsyncJira(settings.server, settings.email, settings.api_token)
+
 # Helper to get Jira client per request/session
-def get_jira_client():
-    jira_server = os.getenv('JIRA_SERVER', '')
-    jira_email = os.getenv('JIRA_EMAIL', '')
-    jira_api_token = os.getenv('JIRA_API_TOKEN', '')
-    if not jira_server:
-        raise ValueError("JIRA_SERVER environment variable is required")
-    if not jira_email:
-        raise ValueError("JIRA_EMAIL environment variable is required")
-    if not jira_api_token:
-        raise ValueError("JIRA_API_TOKEN environment variable is required")
-    return JIRA(server=jira_server, basic_auth=(jira_email, jira_api_token))
-
-# Remove global credential validation and global jira client initialization
+async def get_jira_client() -> AsyncJira:
+    jira = _client_for(SETTINGS)
+    await jira.resolve_fields()
+    return jira
+
+def _issue_key_error(issue_key: str, error: str) -> Dict[str, Any]:
+    return {"issue_key": issue_key, "error": error, "success": False}
+
+async def fetch_issues_by_key(jira: AsyncJira, issue_keys: List[str]) -> Tuple[list, List[Dict[str, Any]]]:
+    """
+    Fetch issues with one 'key in (...)' search per MAX_SEARCH_PAGE_SIZE keys.
+    
+    Malformed keys are reported rather than sent, so they can't fail the query
+    for the other keys. If Jira still rejects a batch (e.g. an unknown key under
+    strict validation), that batch is looked up key by key.
+    
+    Returns:
+        The issues found, and an error entry for each key that couldn't be fetched
+    """
+    errors = [_issue_key_error(key, "Invalid issue key") for key in issue_keys if not ISSUE_KEY_PATTERN.fullmatch(key)]
+    valid_keys = [key for key in issue_keys if ISSUE_KEY_PATTERN.fullmatch(key)]
+
+    async def fetch(batch: List[str]) -> Tuple[list, List[Dict[str, Any]]]:
+        try:
+            # Relaxed validation drops unknown keys instead of failing the batch
+            result = await jira.search(f'key in ({",".join(batch)})', max_results=len(batch), validate_query=False)
+            return result["issues"], []
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 400:
+                raise
+        found, failed = [], []
+        lookups = await asyncio.gather(*(jira.issue(issue_key) for issue_key in batch), return_exceptions=True)
+        for issue_key, issue in zip(batch, lookups):
+            if isinstance(issue, httpx.HTTPStatusError):
+                failed.append(_issue_key_error(issue_key, issue.response.text or str(issue)))
+            elif isinstance(issue, Exception):
+                raise issue
+            else:
+                found.append(issue)
+        return found, failed
+
+    batches = [valid_keys[start:start + MAX_SEARCH_PAGE_SIZE] for start in range(0, len(valid_keys), MAX_SEARCH_PAGE_SIZE)]
+    issues = []
+    for found, failed in await asyncio.gather(*(fetch(batch) for batch in batches)):
+        issues.extend(found)
+        errors.extend(failed)
+    return issues, errors
+
+async def _search_by_token(
+    jira: AsyncJira, jql: str, max_results: int, batch_size: int, fields: Optional[str] = None
+) -> list:
+    """
+    Page through a Jira Cloud search with nextPageToken.
+    
+    Each token comes from the page before it, so the pages are fetched in turn.
+    """
+    issues = []
+    token = None
+    while max_results <= 0 or len(issues) < max_results:
+        limit = batch_size if max_results <= 0 else min(batch_size, max_results - len(issues))
+        page = await jira.search(jql, max_results=limit, fields=fields, next_page_token=token)
+        issues.extend(page["issues"])
+        token = page.get("nextPageToken")
+        if not page["issues"] or not token:
+            break
+    return issues
+
+async def search_all(
+    jira: AsyncJira, jql: str, max_results: int = 100, batch_size: int = 100,
+    workers: int = 8, fields: Optional[str] = None
+) -> list:
+    """
+    Run a JQL search, fetching the pages after the first one concurrently where
+    Jira allows it.
+    
+    On Data Center the first page tells us how many issues match; the remaining
+    startAt windows are independent, so they are requested in parallel rather
+    than waiting a full round-trip per page. Jira Cloud only serves searches
+    from /search/jql, which pages with nextPageToken and reports no total, so
+    there the pages are fetched one after another.
+    
+    Args:
+        jira: Jira client to search with
+        jql: Jira Query Language string
+        max_results: Maximum number of issues to return; 0 or less fetches every match
+        batch_size: Number of issues requested per page; values below 1 are treated as 1
+        workers: Maximum number of pages fetched at the same time
+        fields: Fields to return; defaults to the client's projected fields
+        
+    Returns:
+        List of matching issues, in search order
+    """
+    # batch_size comes straight from tool arguments; a zero or negative page size
+    # would make a meaningless request and an infinite page range
+    batch_size = max(1, batch_size)
+    if await jira.is_cloud():
+        return await _search_by_token(jira, jql, max_results, batch_size, fields)
+    limit = batch_size if max_results <= 0 else min(batch_size, max_results)
+    first = await jira.search(jql, 0, limit, fields)
+    issues = first["issues"]
+    wanted = first["total"] if max_results <= 0 else min(first["total"], max_results)
+    # Jira may cap the page below batch_size, so window on what it actually returned
+    page_size = max(1, first.get("maxResults") or batch_size)
+    starts = range(len(issues), wanted, page_size)
+    if not issues or not starts:
+        return issues
+
+    semaphore = asyncio.Semaphore(workers)
+
+    async def fetch(start_at: int) -> list:
+        async with semaphore:
+            page = await jira.search(jql, start_at, min(page_size, wanted - start_at), fields)
+        return page["issues"]
+
+    for page in await asyncio.gather(*(fetch(start_at) for start_at in starts)):
+        issues.extend(page)
+    return issues
 
 class Issue(BaseModel):
     key: str
@@ -37,29 +403,48 @@ class Issue(BaseModel):
     sprint: Optional[str] = None
     acceptance_criteria: Optional[str] = None
 
-def extract_acceptance_criteria(issue) -> Optional[str]:
+def extract_acceptance_criteria(issue, ac_field_id: str = DEFAULT_ACCEPTANCE_CRITERIA_FIELD) -> Optional[str]:
     """
-    Extract acceptance criteria from customfield_10127.
+    Extract acceptance criteria from the acceptance criteria custom field.
     """
-    try:
-        if hasattr(issue.fields, 'customfield_10127'):
-            ac_field = issue.fields.customfield_10127
-            if ac_field:
-                # Handle different field value formats
-                if isinstance(ac_field, str):
-                    return ac_field.strip()
-                elif hasattr(ac_field, 'content'):
-                    # Handle structured content
-                    if isinstance(ac_field.content, list):
-                        return '\n'.join([str(item) for item in ac_field.content if item])
-                    else:
-                        return str(ac_field.content)
-                else:
-                    return str(ac_field).strip()
-        return None
-    except Exception as e:
-        print(f"Error extracting acceptance criteria: {str(e)}")
+    ac_field = issue["fields"].get(ac_field_id)
+    if not ac_field:
         return None
+    # Plain text is by far the most common format, so check it first
+    if type(ac_field) is str:
+        return ac_field.strip()
+    # Structured (ADF) content keeps its nodes under "content"
+    content = ac_field.get("content") if type(ac_field) is dict else None
+    if content is None:
+        return str(ac_field).strip()
+    if type(content) is list:
+        return '\n'.join([str(item) for item in content if item])
+    return str(content)
+
+def project_issue(
+    issue, sprint_field_id: str = DEFAULT_SPRINT_FIELD, ac_field_id: str = DEFAULT_ACCEPTANCE_CRITERIA_FIELD,
+    _extract_ac=extract_acceptance_criteria
+) -> Dict[str, Any]:
+    """
+    Project a raw Jira issue onto the flat dict the tools return.
+    """
+    fields = issue["fields"]
+    assignee = fields.get("assignee")
+    priority = fields.get("priority")
+    sprints = fields.get(sprint_field_id)
+    return {
+        "key": issue["key"],
+        "summary": fields["summary"],
+        "status": fields["status"]["name"],
+        "assignee": assignee["displayName"] if assignee else "Unassigned",
+        "created": fields["created"],
+        "description": fields.get("description") or "No description",
+        "issuetype": fields["issuetype"]["name"],
+        "priority": priority["name"] if priority else None,
+        "sprint": sprints[0]["name"] if sprints else None,
+        "acceptance_criteria": _extract_ac(issue, ac_field_id),
+        "success": True
+    }
 
 class JiraMCP(FastMCP):
     """Custom MCP server for Jira functionality"""
@@ -79,86 +464,88 @@ class JiraMCP(FastMCP):
                 Issue details if found
             """
             try:
-                jira = get_jira_client()
-                issue = jira.issue(issue_key)
-                return {
-                    "key": issue.key,
-                    "summary": issue.fields.summary,
-                    "status": issue.fields.status.name,
-                    "assignee": issue.fields.assignee.displayName if issue.fields.assignee else "Unassigned",
-                    "created": issue.fields.created,
-                    "description": issue.fields.description if issue.fields.description else "No description",
-                    "issuetype": issue.fields.issuetype.name,
-                    "priority": issue.fields.priority.name if issue.fields.priority else None,
-                    "sprint": issue.fields.customfield_10020[0].name if hasattr(issue.fields, 'customfield_10020') and issue.fields.customfield_10020 else None,
-                    "acceptance_criteria": extract_acceptance_criteria(issue),
-                    "success": True
-                }
+                jira = await get_jira_client()
+                issue = await jira.load_issue(issue_key)
+                return project_issue(issue, jira.sprint_field, jira.ac_field)
             except Exception as e:
+                log.warning("get_issue failed", exc_info=True)
                 return {
                     "error": str(e),
                     "success": False
                 }
         
+        @self.tool("get_issues_bulk")
+        async def get_issues_bulk(issue_keys: List[str]) -> List[Dict[str, Any]]:
+            """
+            Get details of several Jira issues in a single request.
+            
+            Keys are looked up 100 at a time (Jira's page limit). Malformed keys,
+            and keys that can't be fetched when Jira rejects a batch, come back as
+            {"issue_key", "error", "success": false} entries after the issues found.
+            
+            Args:
+                issue_keys: The Jira issue keys (e.g., ["PROJ-123", "PROJ-124"])
+                
+            Returns:
+                List of issue details for the keys that were found
+            """
+            try:
+                if not issue_keys:
+                    return []
+                jira = await get_jira_client()
+                # One JQL query per 100 keys instead of one round-trip per key
+                issues, errors = await fetch_issues_by_key(jira, issue_keys)
+                return [project_issue(issue, jira.sprint_field, jira.ac_field) for issue in issues] + errors
+            except Exception as e:
+                log.warning("get_issues_bulk failed", exc_info=True)
+                return [{
+                    "error": str(e),
+                    "success": False
+                }]
+        
         @self.tool("search_issues")
-        async def search_issues(jql: str) -> List[Dict[str, Any]]:
+        async def search_issues(jql: str, max_results: int = 100, batch_size: int = 100) -> List[Dict[str, Any]]:
             """
             Search for Jira issues using JQL.
             
             Args:
                 jql: Jira Query Language string
+                max_results: Maximum number of issues to return; 0 or less returns every match
+                batch_size: Number of issues fetched per request to Jira (at least 1)
                 
             Returns:
                 List of matching issues
             """
             try:
-                jira = get_jira_client()
-                issues = jira.search_issues(jql, maxResults=50)
-                return [{
-                    "key": issue.key,
-                    "summary": issue.fields.summary,
-                    "status": issue.fields.status.name,
-                    "assignee": issue.fields.assignee.displayName if issue.fields.assignee else "Unassigned",
-                    "created": issue.fields.created,
-                    "description": issue.fields.description if issue.fields.description else "No description",
-                    "issuetype": issue.fields.issuetype.name,
-                    "priority": issue.fields.priority.name if issue.fields.priority else None,
-                    "sprint": issue.fields.customfield_10020[0].name if hasattr(issue.fields, 'customfield_10020') and issue.fields.customfield_10020 else None,
-                    "acceptance_criteria": extract_acceptance_criteria(issue),
-                    "success": True
-                } for issue in issues]
+                jira = await get_jira_client()
+                issues = await search_all(jira, jql, max_results, batch_size)
+                return [project_issue(issue, jira.sprint_field, jira.ac_field) for issue in issues]
             except Exception as e:
+                log.warning("search_issues failed", exc_info=True)
                 return [{
                     "error": str(e),
                     "success": False
                 }]
         
         @self.tool("get_my_issues")
-        async def get_my_issues() -> List[Dict[str, Any]]:
+        async def get_my_issues(max_results: int = 100, batch_size: int = 100) -> List[Dict[str, Any]]:
             """
             Get issues assigned to the current user.
             
+            Args:
+                max_results: Maximum number of issues to return; 0 or less returns every match
+                batch_size: Number of issues fetched per request to Jira (at least 1)
+            
             Returns:
                 List of issues assigned to the current user
             """
             try:
-                jira = get_jira_client()
+                jira = await get_jira_client()
                 jql = f'assignee = currentUser() ORDER BY created DESC'
-                issues = jira.search_issues(jql, maxResults=50)
-                return [{
-                    "key": issue.key,
-                    "summary": issue.fields.summary,
-                    "status": issue.fields.status.name,
-                    "assignee": issue.fields.assignee.displayName if issue.fields.assignee else "Unassigned",
-                    "created": issue.fields.created,
-                    "description": issue.fields.description if issue.fields.description else "No description",
-                    "issuetype": issue.fields.issuetype.name,
-                    "priority": issue.fields.priority.name if issue.fields.priority else None,
-                    "sprint": issue.fields.customfield_10020[0].name if hasattr(issue.fields, 'customfield_10020') and issue.fields.customfield_10020 else None,
-                    "acceptance_criteria": extract_acceptance_criteria(issue),
-                    "success": True
-                } for issue in issues]
+                issues = await search_all(jira, jql, max_results, batch_size)
+                return [project_issue(issue, jira.sprint_field, jira.ac_field) for issue in issues]
             except Exception as e:
+                log.warning("get_my_issues failed", exc_info=True)
                 return [{
                     "error": str(e),
                     "success": False
@@ -167,7 +554,7 @@ class JiraMCP(FastMCP):
         @self.tool("get_acceptance_criteria")
         async def get_acceptance_criteria(issue_key: str) -> Dict[str, Any]:
             """
-            Get acceptance criteria for a specific Jira issue from customfield_10127.
+            Get acceptance criteria for a specific Jira issue from its Acceptance Criteria field.
             
             Args:
                 issue_key: The Jira issue key (e.g., PROJ-123)
@@ -176,23 +563,59 @@ class JiraMCP(FastMCP):
                 Acceptance criteria details if found
             """
             try:
-                jira = get_jira_client()
-                issue = jira.issue(issue_key)
-                ac = extract_acceptance_criteria(issue)
+                jira = await get_jira_client()
+                issue = await jira.load_issue(issue_key)
+                ac = extract_acceptance_criteria(issue, jira.ac_field)
                 
                 return {
-                    "issue_key": issue.key,
-                    "summary": issue.fields.summary,
+                    "issue_key": issue["key"],
+                    "summary": issue["fields"]["summary"],
                     "acceptance_criteria": ac,
                     "has_acceptance_criteria": ac is not None,
                     "success": True
                 }
             except Exception as e:
+                log.warning("get_acceptance_criteria failed", exc_info=True)
                 return {
                     "error": str(e),
                     "success": False
                 }
 
+        @self.tool("search_with_acceptance_criteria")
+        async def search_with_acceptance_criteria(jql: str, max_results: int = 100) -> List[Dict[str, Any]]:
+            """
+            Search for Jira issues using JQL and return each one's acceptance criteria.
+            
+            Args:
+                jql: Jira Query Language string
+                max_results: Maximum number of issues to return; 0 or less returns every match
+                
+            Returns:
+                List of matching issues with their acceptance criteria
+            """
+            try:
+                jira = await get_jira_client()
+                # Fetch only what this projection reads, in the same pass as the search
+                issues = await search_all(jira, jql, max_results, fields=f"summary,status,{jira.ac_field}")
+                results = []
+                for issue in issues:
+                    ac = extract_acceptance_criteria(issue, jira.ac_field)
+                    results.append({
+                        "key": issue["key"],
+                        "summary": issue["fields"]["summary"],
+                        "status": issue["fields"]["status"]["name"],
+                        "acceptance_criteria": ac,
+                        "has_acceptance_criteria": ac is not None,
+                        "success": True
+                    })
+                return results
+            except Exception as e:
+                log.warning("search_with_acceptance_criteria failed", exc_info=True)
+                return [{
+                    "error": str(e),
+                    "success": False
+                }]
+
 def create_sse_server(mcp: JiraMCP):
     """Create a Starlette app that handles SSE connections and message handling"""
     transport = SseServerTransport("/messages/")
@@ -220,18 +643,43 @@ def create_mcp_app():
     app = FastAPI(title="Jira MCP Server")
     mcp = JiraMCP()
     
-    # Mount the SSE server onto the main app
-    app.mount("/", create_sse_server(mcp))
-    
+    # Routes are matched in order, so register this before the catch-all mount
     @app.get("/health")
     async def health_check():
         return {"status": "healthy"}
     
+    # Mount the SSE server onto the main app
+    app.mount("/", create_sse_server(mcp))
+    
     return app
 
+def configure_logging(level: Union[int, str] = logging.INFO) -> QueueListener:
+    """
+    Send jira_mcp log records through a queue to a background thread.
+    
+    Handlers that write to stderr never run on the event loop, so logging a
+    burst of tool failures can't stall other SSE sessions.
+    """
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = QueueListener(log_queue, handler)
+    log.addHandler(QueueHandler(log_queue))
+    log.setLevel(level)
+    log.propagate = False
+    listener.start()
+    return listener
+
 # Create the FastAPI app
 app = create_mcp_app()
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    # Fail fast on missing credentials instead of on the first tool call
+    SETTINGS.validate()
+    # e.g. JIRA_MCP_LOG_LEVEL=DEBUG to also see bulk lookup fallbacks
+    listener = configure_logging(os.getenv('JIRA_MCP_LOG_LEVEL', 'INFO').upper())
+    try:
+        uvicorn.run(app, host="0.0.0.0", port=8000)
+    finally:
+        listener.stop() 
\ No newline at end of file
@@ -1,111 +1,513 @@
 import asyncio
+import io
+import json
+import re
 import sys
-from typing import Optional
-from contextlib import AsyncExitStack
-from anthropic import Anthropic
+import anyio
+import httpx
+from typing import Dict, List, Optional, Tuple
+from contextlib import suppress
+from aioconsole import get_standard_streams
+from cachetools import TTLCache
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
 from dotenv import load_dotenv
 from mcp import ClientSession
 from mcp.client.sse import sse_client
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
 
 load_dotenv()  # Load environment variables from .env
 
+# Read-only tools that are safe to run speculatively and throw away
+SPECULATIVE_TOOLS = {"get_issue"}
+# Jira issue keys such as DVT-123
+ISSUE_KEY_PATTERN = re.compile(r"\b[A-Z][A-Z0-9]+-\d+\b")
+MAX_SPECULATIVE_CALLS = 3
+
+# Idempotent read tools whose results can be reused for identical calls
+CACHEABLE_TOOLS = {
+    "get_issue", "get_issues_bulk", "search_issues", "get_my_issues",
+    "get_acceptance_criteria", "search_with_acceptance_criteria"
+}
+TOOL_CACHE_TTL = 60  # seconds
+TOOL_CACHE_SIZE = 512
+
+# With message coalescing on, queries arriving within this many seconds of each
+# other are sent as one prompt, up to a combined size budget in characters
+COALESCE_WINDOW = 0.05
+MAX_COALESCED_CHARS = 20000
+QUIT_COMMANDS = ('quit', 'exit')
+
+# Prompt-cache breakpoint; everything up to the marked block is cached server-side
+CACHE_CONTROL = {"type": "ephemeral"}
+
+# Ping the MCP server this often so an idle chat keeps its SSE session warm
+HEARTBEAT_INTERVAL = 20  # seconds
+# Errors that mean the SSE session is gone and has to be reopened
+SESSION_LOST_ERRORS = (ConnectionError, httpx.TransportError, anyio.ClosedResourceError, anyio.BrokenResourceError)
+
+# Connection pool for the MCP transport; it outlives individual SSE sessions
+MCP_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+# sse_client's own defaults, for SDK versions whose factory call passes no timeout
+MCP_HTTP_TIMEOUT = httpx.Timeout(30.0, read=300.0)
+
+def _call_key(tool_name: str, tool_args: dict) -> str:
+    return tool_name + json.dumps(tool_args, sort_keys=True)
+
+def _session_lost(error: Exception) -> bool:
+    if isinstance(error, McpError):
+        return error.error.code == CONNECTION_CLOSED
+    return isinstance(error, SESSION_LOST_ERRORS)
+
+def _failed(result) -> bool:
+    """
+    Whether a tool result reports a failure.
+    
+    The Jira tools catch their own exceptions and return {"error": ..., "success": false}
+    (or a list containing one) rather than setting isError, so the payload is checked too.
+    """
+    if getattr(result, "isError", False):
+        return True
+    for block in getattr(result, "content", None) or []:
+        try:
+            payload = json.loads(getattr(block, "text", None) or "null")
+        except ValueError:
+            continue
+        items = payload if isinstance(payload, list) else [payload]
+        if any(isinstance(item, dict) and item.get("success") is False for item in items):
+            return True
+    return False
+
+def _coalesce(queries: List[str]) -> str:
+    if len(queries) == 1:
+        return queries[0]
+    total = len(queries)
+    return "\n".join(f"--- Message {i} of {total} ---\n{query}" for i, query in enumerate(queries, 1))
+
+async def _read_line(prompt: str) -> Optional[str]:
+    """
+    Read one line from stdin without blocking the event loop.
+    
+    Unlike aioconsole.ainput, a last line with no trailing newline (e.g. at the
+    end of a piped file) is still returned. None means stdin is exhausted.
+    """
+    reader, writer = await get_standard_streams()
+    writer.write(prompt.encode())
+    await writer.drain()
+    data = await reader.readline()
+    if not data:
+        return None
+    return data.decode().rstrip("\n")
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """Lends the client's MCP connection pool to sse_client without letting it close the pool."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self):
+        # The pool is closed in MCPClient.cleanup()
+        pass
+
 class MCPClient:
-    def __init__(self, server_url: str = "http://localhost:8000"):
+    def __init__(
+        self, server_url: str = "http://localhost:8000", max_tool_concurrency: int = 8,
+        speculative: bool = False, allow_message_coalescing: bool = False, max_tool_turns: int = 5
+    ):
         self.server_url = server_url
+        # Upper bound on tool round-trips per query, so a model that keeps asking
+        # for tools can't make unbounded paid API calls
+        self.max_tool_turns = max_tool_turns
+        self._sse_url = f"{server_url.rstrip('/')}/sse"
+        self.speculative = speculative
+        self.allow_message_coalescing = allow_message_coalescing
         self.session: Optional[ClientSession] = None
-        self.exit_stack = AsyncExitStack()
-        self.anthropic = Anthropic()
+        self._tool_schemas: List[dict] = []
+        self._session_task: Optional[asyncio.Task] = None
+        self._session_closed: Optional[asyncio.Event] = None
+        self._reconnect_lock = asyncio.Lock()
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        # Keep-alive pool for the MCP server, reused when the SSE session is reopened
+        self._mcp_transport = httpx.AsyncHTTPTransport(limits=MCP_HTTP_LIMITS)
+        # HTTP/2 keep-alive client so every turn reuses one connection to the API
+        self._anthropic_http = DefaultAsyncHttpxClient(http2=True)
+        self.anthropic = AsyncAnthropic(http_client=self._anthropic_http)
+        self._tool_semaphore = asyncio.Semaphore(max_tool_concurrency)
+        self._tool_cache = TTLCache(maxsize=TOOL_CACHE_SIZE, ttl=TOOL_CACHE_TTL)
 
     async def connect(self):
         # Connect to the MCP server using SSE transport
-        self.sse_ctx = sse_client(f"{self.server_url}/sse")
-        self.sse = await self.exit_stack.enter_async_context(self.sse_ctx)
-        self.session = await self.exit_stack.enter_async_context(ClientSession(*self.sse))
-        await self.session.initialize()
+        await self._open_session()
         # List available tools
         response = await self.session.list_tools()
         self.tools = response.tools
-        print("\nConnected to server with tools:", [tool.name for tool in self.tools])
-
-    async def process_query(self, query: str) -> str:
-        messages = [
-            {"role": "user", "content": query}
-        ]
-        # Prepare tool schemas for Claude
-        available_tools = [
+        # Tool schemas don't change for the life of the session, so build them once
+        self._tool_schemas = [
             {
                 "name": tool.name,
                 "description": tool.description,
                 "input_schema": tool.inputSchema
             } for tool in self.tools
         ]
+        # Mark the last tool so the whole tools block is prompt-cached across turns
+        if self._tool_schemas:
+            self._tool_schemas[-1] = {**self._tool_schemas[-1], "cache_control": CACHE_CONTROL}
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        print("\nConnected to server with tools:", [tool.name for tool in self.tools])
+
+    async def _open_session(self):
+        ready = asyncio.get_running_loop().create_future()
+        self._session_closed = asyncio.Event()
+        self._session_task = asyncio.create_task(self._run_session(ready, self._session_closed))
+        await ready
+
+    async def _run_session(self, ready: asyncio.Future, closed: asyncio.Event):
+        """
+        Hold the SSE transport and MCP session open until closed is set.
+        
+        sse_client runs a task group, so it has to be entered and exited from
+        the same task. Owning it here lets any task reconnect or clean up.
+        """
+        try:
+            async with sse_client(self._sse_url, httpx_client_factory=self._sse_http_client) as streams:
+                async with ClientSession(*streams) as session:
+                    await session.initialize()
+                    self.session = session
+                    ready.set_result(None)
+                    await closed.wait()
+        except asyncio.CancelledError:
+            ready.cancel()
+            raise
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            # A session that drops after connecting is reopened by the heartbeat or the next tool call
+
+    async def _close_session(self):
+        if self._session_task is None:
+            return
+        self._session_closed.set()
+        with suppress(Exception):
+            await self._session_task
+        self._session_task = None
+
+    async def _reconnect(self, lost_session: ClientSession):
+        async with self._reconnect_lock:
+            # Another caller may already have replaced the session that failed
+            if self.session is not lost_session:
+                return
+            await self._close_session()
+            await self._open_session()
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            session = self.session
+            try:
+                await asyncio.wait_for(session.send_ping(), HEARTBEAT_INTERVAL)
+            except Exception:
+                # Reconnect now rather than on the next query; if the server is down, retry next beat
+                with suppress(Exception):
+                    await self._reconnect(session)
+
+    def _sse_http_client(
+        self, headers: Optional[dict] = None, timeout: Optional[httpx.Timeout] = None,
+        auth: Optional[httpx.Auth] = None
+    ) -> httpx.AsyncClient:
+        # sse_client closes the client it gets, so hand it a view onto the MCP pool
+        return httpx.AsyncClient(
+            transport=_SharedTransport(self._mcp_transport), headers=headers,
+            timeout=timeout or MCP_HTTP_TIMEOUT, auth=auth
+        )
+
+    async def process_query(self, query: str) -> str:
+        messages = [
+            {"role": "user", "content": query}
+        ]
+        available_tools = self._tool_schemas
+        # Start likely tool calls now so they overlap with the first Claude call
+        speculative = self._start_speculative_calls(query) if self.speculative else {}
+        try:
+            return await self._run_tool_loop(messages, available_tools, speculative)
+        finally:
+            for task in speculative.values():
+                task.cancel()
+
+    async def _run_tool_loop(self, messages: list, available_tools: list, speculative: Dict[str, asyncio.Task]) -> str:
         # Initial Claude API call
-        response = self.anthropic.messages.create(
-            model="claude-3-opus-20240229",
-            max_tokens=1000,
-            messages=messages,
-            tools=available_tools
+        response, tool_tasks = await self._stream_turn(
+            messages, available_tools, speculative, run_tools=self.max_tool_turns > 0
         )
-        final_text = []
-        assistant_message_content = []
-        for content in response.content:
-            if content.type == 'text':
-                final_text.append(content.text)
+        final_text = io.StringIO()
+        tool_turns = 0
+        while True:
+            assistant_message_content = []
+            tool_uses = []
+            for content in response.content:
+                if content.type == 'text':
+                    final_text.write(content.text)
+                    final_text.write("\n")
+                elif content.type == 'tool_use':
+                    final_text.write(f"[Calling tool {content.name} with args {content.input}]\n")
+                    tool_uses.append(content)
                 assistant_message_content.append(content)
-            elif content.type == 'tool_use':
-                tool_name = content.name
-                tool_args = content.input
-                # Execute tool call
+            if not tool_uses:
+                break
+            if response.stop_reason == "max_tokens":
+                # The last tool_use may have been cut off mid-input, so run none of them
+                for task in tool_tasks.values():
+                    task.cancel()
+                final_text.write("[Response hit max_tokens; tool calls were not run]\n")
+                break
+            if tool_turns >= self.max_tool_turns:
+                final_text.write(f"[Stopped after {self.max_tool_turns} tool turns; tool calls were not run]\n")
+                break
+            tool_turns += 1
+            # Each tool call was started while the turn was still streaming
+            results = await asyncio.gather(
+                *(tool_tasks[content.id] for content in tool_uses),
+                return_exceptions=True
+            )
+            # Guesses Claude didn't ask for in its first turn are discarded
+            for task in speculative.values():
+                task.cancel()
+            speculative.clear()
+            tool_results = []
+            for content, result in zip(tool_uses, results):
+                if isinstance(result, Exception):
+                    tool_results.append({
+                        "type": "tool_result",
+                        "tool_use_id": content.id,
+                        "content": str(result),
+                        "is_error": True
+                    })
+                else:
+                    tool_results.append({
+                        "type": "tool_result",
+                        "tool_use_id": content.id,
+                        "content": result.content if hasattr(result, 'content') else str(result)
+                    })
+            messages.append({
+                "role": "assistant",
+                "content": assistant_message_content
+            })
+            messages.append({
+                "role": "user",
+                "content": tool_results
+            })
+            # Get next response from Claude; tools it asks for past the limit aren't started
+            response, tool_tasks = await self._stream_turn(
+                messages, available_tools, speculative, run_tools=tool_turns < self.max_tool_turns
+            )
+        # Drop the separator after the last line
+        return final_text.getvalue()[:-1]
+
+    async def _stream_turn(
+        self, messages: list, available_tools: list, speculative: Dict[str, asyncio.Task], run_tools: bool = True
+    ):
+        """
+        Stream one Claude turn, starting each tool call as soon as its tool_use block completes.
+        
+        Tool calls overlap with the rest of the response being generated. A
+        speculative call that guessed the same tool and arguments is reused.
+        With run_tools off, no tool calls are started.
+        
+        Returns:
+            The final message and the tool call tasks keyed by tool_use id
+        """
+        tool_tasks: Dict[str, asyncio.Future] = {}
+        try:
+            async with self.anthropic.messages.stream(
+                model="claude-3-opus-20240229",
+                max_tokens=1000,
+                messages=self._mark_cacheable(messages),
+                tools=available_tools
+            ) as stream:
+                async for event in stream:
+                    if run_tools and event.type == "content_block_stop" and event.content_block.type == "tool_use":
+                        block = event.content_block
+                        tool_tasks[block.id] = (
+                            speculative.pop(_call_key(block.name, block.input), None)
+                            or asyncio.create_task(self._call_tool(block.name, block.input))
+                        )
+                response = await stream.get_final_message()
+        except BaseException:
+            for task in tool_tasks.values():
+                task.cancel()
+            raise
+        return response, tool_tasks
+
+    def _mark_cacheable(self, messages: list) -> list:
+        """
+        Return messages with a prompt-cache breakpoint on the last block.
+        
+        The tool loop resends the whole history on every hop, so once there is
+        a tool result, caching the prefix lets the API reuse it instead of
+        reprocessing it. The caller's list is left untouched so breakpoints
+        don't pile up across turns.
+        """
+        if len(messages) < 2:
+            return messages
+        last = messages[-1]
+        content = last["content"]
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        content = content[:-1] + [{**content[-1], "cache_control": CACHE_CONTROL}]
+        return messages[:-1] + [{**last, "content": content}]
+
+    def _speculate(self, query: str) -> List[Tuple[str, dict]]:
+        """Guess tool calls Claude is likely to make first, e.g. get_issue for keys in the query."""
+        tool_names = {tool.name for tool in self.tools} & SPECULATIVE_TOOLS
+        if "get_issue" not in tool_names:
+            return []
+        issue_keys = list(dict.fromkeys(ISSUE_KEY_PATTERN.findall(query)))
+        return [("get_issue", {"issue_key": key}) for key in issue_keys[:MAX_SPECULATIVE_CALLS]]
+
+    def _start_speculative_calls(self, query: str) -> Dict[str, asyncio.Task]:
+        tasks = {}
+        for tool_name, tool_args in self._speculate(query):
+            task = asyncio.create_task(self._call_tool(tool_name, tool_args))
+            # Unused guesses may fail; don't let that surface as an unretrieved exception
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            tasks[_call_key(tool_name, tool_args)] = task
+        return tasks
+
+    async def _call_tool(self, tool_name: str, tool_args: dict):
+        cacheable = tool_name in CACHEABLE_TOOLS
+        if cacheable:
+            key = _call_key(tool_name, tool_args)
+            cached = self._tool_cache.get(key)
+            if cached is not None:
+                return cached
+        # Bound how many tool calls hit the MCP server at once
+        async with self._tool_semaphore:
+            session = self.session
+            try:
+                result = await session.call_tool(tool_name, tool_args)
+            except Exception as e:
+                if not _session_lost(e):
+                    raise
+                # The SSE session dropped (e.g. while idle); reopen it and retry once
+                await self._reconnect(session)
                 result = await self.session.call_tool(tool_name, tool_args)
-                final_text.append(f"[Calling tool {tool_name} with args {tool_args}]")
-                assistant_message_content.append(content)
-                messages.append({
-                    "role": "assistant",
-                    "content": assistant_message_content
-                })
-                messages.append({
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "tool_result",
-                            "tool_use_id": content.id,
-                            "content": result.content if hasattr(result, 'content') else str(result)
-                        }
-                    ]
-                })
-                # Get next response from Claude
-                response = self.anthropic.messages.create(
-                    model="claude-3-opus-20240229",
-                    max_tokens=1000,
-                    messages=messages,
-                    tools=available_tools
-                )
-                final_text.append(response.content[0].text)
-        return "\n".join(final_text)
+        # Failures are not cached so the next call retries
+        if cacheable and not _failed(result):
+            self._tool_cache[key] = result
+        return result
+
+    async def run_batch(self, queries: List[str], concurrency: int = 8) -> List[str]:
+        """
+        Answer independent queries concurrently over the connected session.
+        
+        Results come back in the same order as queries.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_one(query: str) -> str:
+            async with semaphore:
+                return await self.process_query(query)
+
+        return await asyncio.gather(*(run_one(query) for query in queries))
 
     async def chat_loop(self):
         print("\nMCP Client Chatbot Started!")
         print("Type your queries or 'quit' to exit.")
+        if self.allow_message_coalescing:
+            await self._coalescing_chat_loop()
+            return
         while True:
             try:
-                query = input("\nYou: ").strip()
-                if query.lower() in ('quit', 'exit'):
+                # Read without blocking the loop, so background tool calls and the SSE stream keep running
+                line = await _read_line("\nYou: ")
+                # Running out of input (e.g. a piped file) ends the chat like 'quit'
+                if line is None or line.strip().lower() in QUIT_COMMANDS:
                     print("\nGoodbye!")
                     break
+                query = line.strip()
                 response = await self.process_query(query)
                 print("\nAssistant:\n" + response)
             except Exception as e:
                 print(f"\nError: {str(e)}")
 
+    async def _read_queries(self, queue: asyncio.Queue):
+        # Keep reading while earlier queries are being answered; None marks the end
+        while True:
+            line = await _read_line("\nYou: ")
+            if line is None:
+                break
+            query = line.strip()
+            if query.lower() in QUIT_COMMANDS:
+                break
+            if query:
+                await queue.put(query)
+        await queue.put(None)
+
+    async def _coalescing_chat_loop(self):
+        """
+        Answer queries that arrive together (e.g. piped from a file) in one session.
+        
+        Queries received within COALESCE_WINDOW of each other are combined into a
+        single prompt with delimiters, up to MAX_COALESCED_CHARS; a query that
+        would exceed the budget starts the next batch instead.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        reader = asyncio.create_task(self._read_queries(queue))
+        carry = None
+        finished = False
+        try:
+            while not finished:
+                query = carry if carry is not None else await queue.get()
+                carry = None
+                if query is None:
+                    break
+                batch, size = [query], len(query)
+                while True:
+                    try:
+                        query = await asyncio.wait_for(queue.get(), COALESCE_WINDOW)
+                    except asyncio.TimeoutError:
+                        break
+                    if query is None:
+                        finished = True
+                        break
+                    if size + len(query) > MAX_COALESCED_CHARS:
+                        carry = query
+                        break
+                    batch.append(query)
+                    size += len(query)
+                try:
+                    response = await self.process_query(_coalesce(batch))
+                    print("\nAssistant:\n" + response)
+                except Exception as e:
+                    print(f"\nError: {str(e)}")
+            print("\nGoodbye!")
+        finally:
+            reader.cancel()
+
     async def cleanup(self):
-        await self.exit_stack.aclose()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._heartbeat_task
+        await self._close_session()
+        await self._mcp_transport.aclose()
+        await self.anthropic.close()
 
 async def main():
     import argparse
     parser = argparse.ArgumentParser(description='MCP Client Chatbot')
     parser.add_argument('--server', default='http://localhost:8000', help='MCP server URL')
+    parser.add_argument('--speculative', action='store_true',
+                        help='Prefetch likely read-only tool results while Claude is thinking')
+    parser.add_argument('--coalesce', action='store_true',
+                        help='Answer queries that arrive together (e.g. piped input) in one prompt')
     args = parser.parse_args()
-    client = MCPClient(server_url=args.server)
+    client = MCPClient(
+        server_url=args.server, speculative=args.speculative,
+        allow_message_coalescing=args.coalesce
+    )
     try:
         await client.connect()
         await client.chat_loop()
@@ -113,4 +515,10 @@ async def main():
         await client.cleanup()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        # libuv-backed event loop; not available on Windows
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -18,20 +18,18 @@ async def main():
         await client.connect()
         print(f"\nConnected! Tools: {[tool.name for tool in client.tools]}")
 
-        # Test each tool if available
+        # Test each tool if available; the queries are independent, so run them together
         tool_names = [tool.name for tool in client.tools]
-        if 'get_my_issues' in tool_names:
-            print_section("Testing 'get_my_issues'")
-            response = await client.process_query("Show my issues")
-            print_tool_result('get_my_issues', response)
-        if 'search_issues' in tool_names:
-            print_section("Testing 'search_issues'")
-            response = await client.process_query("Search for issues in project = DVT")
-            print_tool_result('search_issues', response)
-        if 'get_issue' in tool_names:
-            print_section("Testing 'get_issue'")
-            response = await client.process_query("Show details for issue DVT-123")
-            print_tool_result('get_issue', response)
+        queries = {
+            'get_my_issues': "Show my issues",
+            'search_issues': "Search for issues in project = DVT",
+            'get_issue': "Show details for issue DVT-123",
+        }
+        tests = [(name, query) for name, query in queries.items() if name in tool_names]
+        print_section(f"Testing {', '.join(repr(name) for name, _ in tests)}")
+        responses = await client.run_batch([query for _, query in tests])
+        for (name, _), response in zip(tests, responses):
+            print_tool_result(name, response)
     finally:
         await client.cleanup()
 
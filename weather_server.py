@@ -1,6 +1,7 @@
 import asyncio
+import itertools
 import random
-from datetime import datetime
+import time
 from mcp.types import Tool, TextContent
 from mcp.server.lowlevel.server import Server
 from mcp.server.stdio import stdio_server
@@ -21,6 +22,27 @@ weather_tool = Tool(
     }
 )
 
+# Sample weather is drawn up front into parallel arrays and read back as a
+# ring, so a call costs an index lookup instead of three RNG calls
+CONDITIONS = ["Sunny", "Cloudy", "Rainy", "Snowy", "Partly Cloudy"]
+RING_SIZE = 4096  # power of two so the index wraps with a mask
+_temperatures = [random.randint(0, 35) for _ in range(RING_SIZE)]
+_humidities = [random.randint(30, 90) for _ in range(RING_SIZE)]
+_conditions = random.choices(CONDITIONS, k=RING_SIZE)
+_ring_index = itertools.count()
+
+# The timestamp only has second resolution, so format it at most once a second
+_timestamp_second = None
+_timestamp_text = ""
+
+def current_timestamp():
+    global _timestamp_second, _timestamp_text
+    now = int(time.time())
+    if now != _timestamp_second:
+        _timestamp_second = now
+        _timestamp_text = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))
+    return _timestamp_text
+
 # Create the server
 server = Server("WeatherServer", version="1.0.0")
 
@@ -34,15 +56,16 @@ async def handle_list_tools():
 async def handle_call_tool(name, arguments):
     if name == "get_weather":
         location = arguments.get("location", "Unknown")
-        temperature = random.randint(0, 35)
-        conditions = random.choice(["Sunny", "Cloudy", "Rainy", "Snowy", "Partly Cloudy"])
-        humidity = random.randint(30, 90)
+        i = next(_ring_index) & (RING_SIZE - 1)
+        temperature = _temperatures[i]
+        conditions = _conditions[i]
+        humidity = _humidities[i]
         weather_data = (
             f"Weather for {location}:\n"
             f"Temperature: {temperature}°C\n"
             f"Conditions: {conditions}\n"
             f"Humidity: {humidity}%\n"
-            f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            f"Timestamp: {current_timestamp()}"
         )
         return [TextContent(type="text", text=weather_data)]
     return [TextContent(type="text", text="Unknown tool")] 
@@ -56,4 +79,10 @@ async def main():
         )
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    try:
+        # libuv-backed event loop; not available on Windows
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main()) 
\ No newline at end of file